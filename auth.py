@@ -1,28 +1,107 @@
 """
 Authentication utilities for earthaccess and Google Earth Engine
 """
+import json
 import logging
-import earthaccess
-import ee
+import os
+import time
+
+# earthaccess and ee are imported lazily inside the auth functions:
+# ee in particular drags in the whole Google API client stack, which is
+# wasted cold-start time when ACTION only needs one of the services
+
+# Cache file holding the Earthdata token between runs, so a cron-driven
+# invocation can skip the credential/token exchange roundtrip
+_TOKEN_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "ecostress", "earthaccess_token.json")
+
+# In-process state so repeated authenticate calls within one run are free
+_earthaccess_authenticated = False
+_gee_initialized = set()
+
+
+def _load_cached_token():
+    """Return the cached Earthdata token, or None if missing/expired"""
+    try:
+        with open(_TOKEN_CACHE_PATH) as cache_file:
+            cached = json.load(cache_file)
+        if time.time() < cached.get("expires_at", 0) - 60:
+            return cached.get("token")
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _save_token_cache(auth):
+    """Persist the Earthdata token so later runs can reuse it"""
+    token_info = getattr(auth, "token", None) or {}
+    token = token_info.get("access_token")
+    if not token:
+        return
+
+    expires_at = _parse_expiration(token_info.get("expiration_date"))
+    try:
+        os.makedirs(os.path.dirname(_TOKEN_CACHE_PATH), exist_ok=True)
+        with open(_TOKEN_CACHE_PATH, "w") as cache_file:
+            json.dump({"token": token, "expires_at": expires_at}, cache_file)
+        os.chmod(_TOKEN_CACHE_PATH, 0o600)
+    except OSError as e:
+        logging.warning(f"Could not cache Earthdata token: {str(e)}")
+
+
+def _parse_expiration(expiration_date):
+    """Convert the token expiration string to a Unix timestamp"""
+    for fmt in ("%m/%d/%Y", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return time.mktime(time.strptime(expiration_date, fmt))
+        except (TypeError, ValueError):
+            continue
+    # Unknown format: assume the CMR default of roughly two months and
+    # keep a conservative margin
+    return time.time() + 30 * 86400
 
 
 def authenticate_earthaccess(auth_mode="netrc"):
     """
     Authenticate with earthaccess
-    
+
     Args:
         auth_mode: Authentication mode ("netrc" or "interactive")
-        
+
     Returns:
         bool: True if authentication successful, False otherwise
     """
+    global _earthaccess_authenticated
+    if _earthaccess_authenticated:
+        logging.info("Reusing earthaccess authentication from earlier in this run")
+        return True
+
+    import earthaccess
+
     logging.info(f"Authenticating with earthaccess using {auth_mode} mode")
     try:
-        auth = earthaccess.login(strategy=auth_mode)
+        auth = None
+
+        cached_token = _load_cached_token()
+        if cached_token:
+            # Newer earthaccess versions accept a pre-issued token from
+            # the environment, skipping the login handshake entirely
+            os.environ.setdefault("EARTHDATA_TOKEN", cached_token)
+            try:
+                auth = earthaccess.login(strategy="environment")
+            except Exception:
+                auth = None
+            if auth:
+                logging.info("Authenticated with cached Earthdata token")
+
+        if not auth:
+            auth = earthaccess.login(strategy=auth_mode)
         if not auth:
             logging.error("Authentication with earthaccess failed")
             return False
 
+        _save_token_cache(auth)
+        _earthaccess_authenticated = True
         logging.info("Authentication with earthaccess successful")
         return True
     except Exception as e:
@@ -33,17 +112,24 @@ def authenticate_earthaccess(auth_mode="netrc"):
 def authenticate_gee(project_name):
     """
     Authenticate with Google Earth Engine
-    
+
     Args:
         project_name: GEE project name
-        
+
     Returns:
         bool: True if authentication successful, False otherwise
     """
+    if project_name in _gee_initialized:
+        logging.info("Reusing GEE session from earlier in this run")
+        return True
+
+    import ee
+
     try:
         # First check if already authenticated, if not, prompt user
         try:
             ee.Initialize(project=project_name)
+            _gee_initialized.add(project_name)
             logging.info("Already authenticated with Google Earth Engine")
             print("Already authenticated with Google Earth Engine")
             return True
@@ -55,13 +141,14 @@ def authenticate_gee(project_name):
             print("You need to authenticate with Google Earth Engine.")
             print("This will open a browser window for authorization.")
             print("="*60 + "\n")
-            
+
             ee.Authenticate()
             ee.Initialize(project=project_name)
+            _gee_initialized.add(project_name)
             logging.info("Successfully authenticated with Google Earth Engine")
             print("\nSuccessfully authenticated with Google Earth Engine")
             return True
-            
+
     except Exception as e:
         logging.error(f"Error authenticating with GEE: {str(e)}")
         print(f"\nError authenticating with GEE: {str(e)}")
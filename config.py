@@ -7,6 +7,7 @@ MGRS_TILE = "18TUN"  # MGRS tile ID (e.g., 15SWD, 10SFH, 18SUE)
 START_DATE = "2025-01-01"  # Start date (YYYY-MM-DD)
 END_DATE = "2025-11-20"  # End date (YYYY-MM-DD)
 DAY_NIGHT = "DAY"  # "DAY" or "NIGHT"
+DOWNLOAD_WORKERS = 8  # Number of concurrent download threads
 
 # File types to download
 FILE_TYPES = [
@@ -28,6 +29,8 @@ METADATA_PATH = "/Users/jiaxinwang/Documents/ECOSTRESS/metadata_ecostress.csv"
 GEE_PROJECT = "ee-jiaxinwang36201"
 GEE_UPLOAD_BASE = f"projects/{GEE_PROJECT}/Geneva/Ecostress"
 GEE_EMAIL = "jiaxinwang362@gmail.com"
+UPLOAD_WORKERS = 4  # Number of concurrent folder uploads
+UPLOAD_MODE = "full"  # "full", "meta" (metadata only, no upload), or "upload"
 
 # Action to perform: "download", "upload", or "both"
 ACTION = "both"
@@ -3,21 +3,50 @@ CSV metadata enhancement utilities
 """
 import os
 import csv
-import re
 import logging
-from datetime import datetime
-from metadata import get_epsg_from_mgrs
+import tempfile
+from metadata import MGRS_TILE_PATTERN, get_epsg_from_mgrs, iso_to_timestamp_ms
+
+# Optional fast CSV backend: pyarrow parses and serializes CSV in
+# native code with multithreaded chunk decoding, which is much faster
+# than the stdlib csv module on large metadata files
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+# Columns added to every metadata CSV for the GEE upload
+METADATA_FIELDS = [
+    'system:time_start', 'system:time_end', 'EPSG', 'band_type',
+    'attr_identifier_product_doi', 'attr_identifier_product_doi_authority',
+    'begin_orbit_number', 'beginning_date_time', 'collection_concept_id',
+    'concept_id', 'concept_type', 'day_night_flag', 'east_lon',
+    'end_orbit_number', 'ending_date_time', 'format', 'granule_ur',
+    'mgrs_tile', 'native_id', 'north_lat', 'orbit_number',
+    'orbit_number_from_filename', 'parameter_names', 'pge_version',
+    'platform_short_name', 'processing_ID', 'processing_level',
+    'production_date_time', 'provider_date_insert', 'provider_date_update',
+    'provider_id', 'revision_date', 'revision_id', 'sensor', 'short_name',
+    'size_mb', 'south_lat', 'time_start', 'version', 'version_from_filename',
+    'west_lon', 'scene', 'orbit_scene'
+]
 
 
 def enhance_metadata_csv(metadata_path, download_folders, downloaded_files=None):
     """
     Enhance the CSV metadata file with information from granule metadata
-    
+
+    The CSV is streamed row by row through a temporary file instead of
+    being loaded into memory, so memory use stays flat regardless of how
+    many rows the metadata file has.
+
     Args:
         metadata_path: Path to the metadata CSV file
         download_folders: Dictionary of folder paths
         downloaded_files: Optional list of downloaded file information
-        
+
     Returns:
         bool: True if successful, False otherwise
     """
@@ -28,26 +57,46 @@ def enhance_metadata_csv(metadata_path, download_folders, downloaded_files=None)
         return False
 
     try:
-        # Read existing CSV
-        with open(metadata_path, mode='r') as file:
-            reader = csv.DictReader(file)
-            rows = list(reader)
-
-        # Add essential fields to each row
-        _initialize_metadata_fields(rows)
-
-        # Populate metadata from downloaded files or folders
+        # Build all per-file updates up front, keyed by filename stem
+        # (geeup's id_no convention), so each row is matched in O(1)
         if downloaded_files:
-            _populate_from_downloaded_files(rows, downloaded_files)
+            updates_by_stem = _updates_from_downloaded_files(downloaded_files)
         else:
-            _populate_from_folders(rows, download_folders)
-
-        # Write updated CSV
-        with open(metadata_path, mode='w', newline='') as file:
-            fieldnames = rows[0].keys()
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
+            updates_by_stem = _updates_from_folders(download_folders)
+
+        # Use the pyarrow backend when available; otherwise stream the
+        # rows through the stdlib csv module
+        if pa_csv is not None:
+            return _rewrite_with_pyarrow(metadata_path, updates_by_stem)
+
+        # Stream rows through a temporary file and atomically replace
+        # the original once the rewrite is complete
+        with open(metadata_path, mode='r', newline='') as infile:
+            reader = csv.DictReader(infile)
+            fieldnames = list(reader.fieldnames or [])
+            fieldnames += [f for f in METADATA_FIELDS if f not in fieldnames]
+            field_set = set(fieldnames)
+
+            tmp = tempfile.NamedTemporaryFile(
+                mode='w', newline='', dir=os.path.dirname(metadata_path) or '.',
+                suffix='.csv.tmp', delete=False)
+            try:
+                with tmp:
+                    # Plain csv.writer with a prebuilt field order skips
+                    # DictWriter's per-row key validation; row.get fills
+                    # the added columns with '' for untouched rows
+                    writer = csv.writer(tmp)
+                    writer.writerow(fieldnames)
+                    for row in reader:
+                        updates = _find_updates_for_row(updates_by_stem, row.get('id_no', ''))
+                        if updates:
+                            row.update((k, v) for k, v in updates.items() if k in field_set)
+                        writer.writerow([row.get(field, '') for field in fieldnames])
+            except Exception:
+                os.unlink(tmp.name)
+                raise
+
+        os.replace(tmp.name, metadata_path)
 
         logging.info(f"Enhanced metadata saved to {metadata_path}")
         return True
@@ -57,88 +106,130 @@ def enhance_metadata_csv(metadata_path, download_folders, downloaded_files=None)
         return False
 
 
-def _initialize_metadata_fields(rows):
-    """Initialize metadata fields in CSV rows"""
-    field_list = [
-        'system:time_start', 'system:time_end', 'EPSG', 'band_type',
-        'attr_identifier_product_doi', 'attr_identifier_product_doi_authority',
-        'begin_orbit_number', 'beginning_date_time', 'collection_concept_id',
-        'concept_id', 'concept_type', 'day_night_flag', 'east_lon',
-        'end_orbit_number', 'ending_date_time', 'format', 'granule_ur',
-        'mgrs_tile', 'native_id', 'north_lat', 'orbit_number',
-        'orbit_number_from_filename', 'parameter_names', 'pge_version',
-        'platform_short_name', 'processing_ID', 'processing_level',
-        'production_date_time', 'provider_date_insert', 'provider_date_update',
-        'provider_id', 'revision_date', 'revision_id', 'sensor', 'short_name',
-        'size_mb', 'south_lat', 'time_start', 'version', 'version_from_filename',
-        'west_lon', 'scene', 'orbit_scene'
-    ]
-    
+def _rewrite_with_pyarrow(metadata_path, updates_by_stem):
+    """Rewrite the metadata CSV using pyarrow's native CSV parser"""
+    # Read the header with the csv module so every column can be pinned
+    # to string; pyarrow's type inference would otherwise strip leading
+    # zeros from values like orbit numbers
+    with open(metadata_path, mode='r', newline='') as infile:
+        header = next(csv.reader(infile), None)
+    if not header:
+        logging.error(f"Metadata file has no header: {metadata_path}")
+        return False
+
+    table = pa_csv.read_csv(
+        metadata_path,
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in header}))
+
+    fieldnames = header + [f for f in METADATA_FIELDS if f not in header]
+    field_set = set(fieldnames)
+
+    rows = table.to_pylist()
     for row in rows:
-        for field in field_list:
-            row[field] = ''
+        updates = _find_updates_for_row(updates_by_stem, row.get('id_no', ''))
+        if updates:
+            row.update((k, str(v)) for k, v in updates.items() if k in field_set)
+
+    # Missing and null cells default to '' when the columns are built,
+    # so untouched rows need no per-field initialization above
+    out_table = pa.table(
+        {name: [row.get(name) or '' for row in rows] for name in fieldnames})
+    pa_csv.write_csv(out_table, metadata_path)
 
+    logging.info(f"Enhanced metadata saved to {metadata_path}")
+    return True
 
-def _populate_from_downloaded_files(rows, downloaded_files):
-    """Populate metadata from downloaded files information"""
+
+def _find_updates_for_row(updates_by_stem, id_no):
+    """
+    Find the update dict matching a row's id_no
+
+    geeup's id_no is the filename without extension, so a direct dict
+    lookup covers the common case; fall back to a substring scan for
+    any rows that don't follow that convention.
+    """
+    if not id_no:
+        return None
+
+    updates = updates_by_stem.get(id_no)
+    if updates is not None:
+        return updates
+
+    for stem, updates in updates_by_stem.items():
+        if id_no in stem:
+            return updates
+    return None
+
+
+def _updates_from_downloaded_files(downloaded_files):
+    """Build per-file column updates from downloaded files information"""
+    updates_by_stem = {}
     for filename, folder_path, file_type, granule_metadata in downloaded_files:
-        for row in rows:
-            if row['id_no'] in filename:
-                _update_row_with_metadata(row, granule_metadata, file_type)
+        stem = os.path.splitext(filename)[0]
+        updates_by_stem[stem] = _updates_from_metadata(granule_metadata, file_type)
+    return updates_by_stem
 
 
-def _populate_from_folders(rows, download_folders):
-    """Populate basic metadata from folder structure"""
+def _updates_from_folders(download_folders):
+    """Build per-file column updates from the folder structure"""
+    updates_by_stem = {}
     for folder_type, folder_path in download_folders.items():
         if os.path.exists(folder_path):
-            for filename in os.listdir(folder_path):
-                if filename.endswith('.tif'):
-                    for row in rows:
-                        if row['id_no'] in filename:
-                            row['band_type'] = folder_type.replace('.tif', '')
-
-                            mgrs_match = re.search(r'_(\d{2}[A-Z]{3})_', filename)
-                            if mgrs_match:
-                                mgrs_tile = mgrs_match.group(1)
-                                row['mgrs_tile'] = mgrs_tile
-                                epsg = get_epsg_from_mgrs(mgrs_tile)
-                                if epsg:
-                                    row['EPSG'] = epsg
-
-
-def _update_row_with_metadata(row, granule_metadata, file_type):
-    """Update a CSV row with granule metadata"""
+            # scandir yields names in one directory pass without the
+            # extra per-entry stat calls listdir-based checks would need
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    filename = entry.name
+                    if filename.endswith('.tif') and entry.is_file():
+                        updates = {'band_type': folder_type.replace('.tif', '')}
+
+                        mgrs_match = MGRS_TILE_PATTERN.search(filename)
+                        if mgrs_match:
+                            mgrs_tile = mgrs_match.group(1)
+                            updates['mgrs_tile'] = mgrs_tile
+                            epsg = get_epsg_from_mgrs(mgrs_tile)
+                            if epsg:
+                                updates['EPSG'] = epsg
+
+                        updates_by_stem[os.path.splitext(filename)[0]] = updates
+    return updates_by_stem
+
+
+def _updates_from_metadata(granule_metadata, file_type):
+    """Build the column updates for one file from its granule metadata"""
+    updates = {}
+
     # Handle system time fields
-    if 'time_start' in granule_metadata and granule_metadata['time_start']:
-        row['system:time_start'] = granule_metadata['time_start']
-        row['system:time_end'] = granule_metadata.get('time_start', '')
-    elif 'beginning_date_time' in granule_metadata and granule_metadata['beginning_date_time']:
+    if granule_metadata.get('time_start'):
+        updates['system:time_start'] = granule_metadata['time_start']
+        updates['system:time_end'] = granule_metadata['time_start']
+    elif granule_metadata.get('beginning_date_time'):
         try:
-            begin_date = datetime.fromisoformat(
-                granule_metadata['beginning_date_time'].replace('Z', '+00:00')
-            )
-            row['system:time_start'] = int(begin_date.timestamp() * 1000)
-
-            if 'ending_date_time' in granule_metadata and granule_metadata['ending_date_time']:
-                end_date = datetime.fromisoformat(
-                    granule_metadata['ending_date_time'].replace('Z', '+00:00')
-                )
-                row['system:time_end'] = int(end_date.timestamp() * 1000)
+            updates['system:time_start'] = iso_to_timestamp_ms(
+                granule_metadata['beginning_date_time'])
+
+            if granule_metadata.get('ending_date_time'):
+                updates['system:time_end'] = iso_to_timestamp_ms(
+                    granule_metadata['ending_date_time'])
             else:
-                row['system:time_end'] = row['system:time_start']
+                updates['system:time_end'] = updates['system:time_start']
         except Exception as e:
             logging.error(f"Error parsing datetime: {str(e)}")
 
     # Set band type
-    row['band_type'] = file_type
+    updates['band_type'] = file_type
 
     # Set EPSG based on MGRS tile
-    if 'mgrs_tile' in granule_metadata and granule_metadata['mgrs_tile']:
+    if granule_metadata.get('mgrs_tile'):
         epsg = get_epsg_from_mgrs(granule_metadata['mgrs_tile'])
         if epsg:
-            row['EPSG'] = epsg
+            updates['EPSG'] = epsg
 
-    # Transfer all metadata to row
+    # Transfer all remaining metadata; keys not present in the CSV
+    # header are filtered out when the updates are applied to a row
     for key, value in granule_metadata.items():
-        if value is not None and key in row:
-            row[key] = value
+        if value is not None and key not in updates:
+            updates[key] = value
+
+    return updates
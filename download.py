@@ -3,6 +3,7 @@ ECOSTRESS data search and download utilities
 """
 import os
 import logging
+
 import earthaccess
 from metadata import extract_granule_metadata
 
@@ -39,60 +40,115 @@ def search_ecostress_data(short_name, mgrs_tile, start_date, end_date, day_night
     return results
 
 
-def download_data(results, file_types, download_paths):
+def download_data(results, file_types, download_paths, max_workers=8):
     """
     Download ECOSTRESS data to specified paths based on file types
-    
+
     Args:
         results: Search results from earthaccess
         file_types: List of file type suffixes to download
         download_paths: Dictionary mapping file types to download paths
-        
+        max_workers: Number of parallel threads per earthaccess batch
+
     Returns:
         list: List of tuples (filename, destination_path, file_type, granule_metadata)
     """
     downloaded_files = []
     skipped_count = 0
-    download_count = 0
     error_count = 0
 
+    # Scan each destination directory once up front so the per-URL
+    # existence/size checks become dict lookups instead of stat calls
+    existing_sizes = {
+        path: _scan_existing_files(path) for path in set(download_paths.values())
+    }
+
+    # Suffixes are matched by splitting off the filename tail once and
+    # probing a frozenset, instead of a linear endswith scan per URL
+    suffix_set = frozenset(file_types)
+    max_suffix_tokens = max((s.count('_') + 1 for s in file_types), default=1)
+
+    # First pass: decide per URL whether to skip or queue for download
+    work_items = []
     for granule in results:
         granule_metadata = extract_granule_metadata(granule)
 
+        # Fast path: when every expected file for this granule is already
+        # on disk, skip the data_links JSON traversal and URL loop
+        granule_ur = granule_metadata.get('granule_ur', '')
+        if granule_ur and _all_files_cached(granule_ur, file_types, download_paths, existing_sizes):
+            for suffix in file_types:
+                filename = f"{granule_ur}_{suffix}"
+                print(f"⏭️  Skipped (already exists): {filename}")
+                logging.info(f"File already exists, skipping: {filename}")
+                downloaded_files.append(
+                    (filename, download_paths[suffix], suffix.split('.')[0], granule_metadata))
+                skipped_count += 1
+            continue
+
         for url in granule.data_links(access="external"):
             filename = url.split('/')[-1]
-            file_processed = False
 
-            for suffix in file_types:
-                if filename.endswith(suffix):
-                    destination_path = download_paths[suffix]
-                    target_file_path = os.path.join(destination_path, filename)
-
-                    # Check if file already exists and is valid
-                    if os.path.exists(target_file_path):
-                        file_size = os.path.getsize(target_file_path)
-                        if file_size > 0:  # File exists and is not empty
-                            print(f"⏭️  Skipped (already exists): {filename}")
-                            logging.info(f"File already exists, skipping: {filename} ({file_size} bytes)")
-                            downloaded_files.append((filename, destination_path, suffix.split('.')[0], granule_metadata))
-                            skipped_count += 1
-                        else:
-                            # File exists but is empty or corrupted, re-download
-                            print(f"⚠️  Re-downloading (corrupted file): {filename}")
-                            logging.warning(f"File corrupted (0 bytes), re-downloading: {filename}")
-                            os.remove(target_file_path)
-                            _download_file(url, destination_path, filename, suffix, granule_metadata, downloaded_files)
-                            download_count += 1
-                    else:
-                        # File doesn't exist, download it
-                        _download_file(url, destination_path, filename, suffix, granule_metadata, downloaded_files)
-                        download_count += 1
-
-                    file_processed = True
-                    break
-
-            if not file_processed:
+            suffix = _match_suffix(filename, suffix_set, max_suffix_tokens)
+            if suffix is None:
                 logging.debug(f"Skipping unrelated file: {filename}")
+                continue
+
+            destination_path = download_paths[suffix]
+            target_file_path = os.path.join(destination_path, filename)
+
+            # Check if file already exists and is valid
+            file_size = existing_sizes[destination_path].get(filename)
+            if file_size is not None and file_size > 0:
+                print(f"⏭️  Skipped (already exists): {filename}")
+                logging.info(f"File already exists, skipping: {filename} ({file_size} bytes)")
+                downloaded_files.append((filename, destination_path, suffix.split('.')[0], granule_metadata))
+                skipped_count += 1
+            else:
+                if file_size == 0:
+                    # File exists but is empty or corrupted, re-download
+                    print(f"⚠️  Re-downloading (corrupted file): {filename}")
+                    logging.warning(f"File corrupted (0 bytes), re-downloading: {filename}")
+                    os.remove(target_file_path)
+                work_items.append((url, destination_path, filename, suffix, granule_metadata))
+
+    # Second pass: group queued URLs by destination and fetch each batch
+    # with a single earthaccess.download call. The library reuses one
+    # pooled HTTPS session with parallel workers per batch, instead of
+    # paying a fresh TLS handshake per file.
+    download_count = 0
+    if work_items:
+        urls_by_destination = {}
+        for url, destination_path, filename, suffix, granule_metadata in work_items:
+            urls_by_destination.setdefault(destination_path, []).append(url)
+
+        for destination_path, urls in urls_by_destination.items():
+            os.makedirs(destination_path, exist_ok=True)
+            print(f"⬇️  Downloading {len(urls)} files -> {destination_path}")
+            logging.info(f"Downloading {len(urls)} files -> {destination_path}")
+            try:
+                earthaccess.download(urls, destination_path, threads=max_workers)
+            except Exception as e:
+                logging.error(f"Error downloading batch to {destination_path}: {str(e)}")
+                print(f"   ❌ Batch error: {destination_path} - {str(e)}")
+
+        # Verify every queued file made it to disk; a single stat call
+        # covers both the existence check and the logged size
+        for url, destination_path, filename, suffix, granule_metadata in work_items:
+            target_file_path = os.path.join(destination_path, filename)
+            try:
+                file_size = os.stat(target_file_path).st_size
+            except FileNotFoundError:
+                file_size = 0
+            if file_size > 0:
+                downloaded_files.append(
+                    (filename, destination_path, suffix.split('.')[0], granule_metadata))
+                logging.info(f"Successfully downloaded: {filename} ({file_size} bytes)")
+                download_count += 1
+            else:
+                logging.error(f"Download verification failed: {filename}")
+                print(f"   ❌ Verification failed: {filename}")
+                error_count += 1
 
     # Print summary
     print(f"\n📊 Download Summary:")
@@ -104,37 +160,64 @@ def download_data(results, file_types, download_paths):
     return downloaded_files
 
 
-def _download_file(url, destination_path, filename, suffix, granule_metadata, downloaded_files):
+def _all_files_cached(granule_ur, file_types, download_paths, existing_sizes):
     """
-    Helper function to download a single file
-    
+    Check whether every expected file for a granule is already on disk
+
+    Args:
+        granule_ur: Granule UR the filenames are derived from
+        file_types: List of file type suffixes
+        download_paths: Dictionary mapping file types to download paths
+        existing_sizes: Per-directory filename -> size maps
+
+    Returns:
+        bool: True if all expected files exist and are non-empty
+    """
+    for suffix in file_types:
+        sizes = existing_sizes.get(download_paths[suffix], {})
+        if sizes.get(f"{granule_ur}_{suffix}", 0) <= 0:
+            return False
+    return True
+
+
+def _match_suffix(filename, suffix_set, max_suffix_tokens):
+    """
+    Match a filename against the configured file type suffixes
+
     Args:
-        url: URL to download from
-        destination_path: Local destination directory
-        filename: Name of the file
-        suffix: File type suffix
-        granule_metadata: Metadata for the granule
-        downloaded_files: List to append successful downloads to
+        filename: Name of the candidate file
+        suffix_set: Frozenset of file type suffixes (e.g. 'LST_err.tif')
+        max_suffix_tokens: Largest underscore token count of any suffix
+
+    Returns:
+        str: The matching suffix, or None
+    """
+    parts = filename.rsplit('_', max_suffix_tokens)
+    # Longest tail first so multi-token suffixes like LST_err.tif win
+    # over their shorter tails
+    for start in range(1, len(parts)):
+        candidate = '_'.join(parts[start:])
+        if candidate in suffix_set:
+            return candidate
+    return None
+
+
+def _scan_existing_files(destination_path):
     """
-    print(f"⬇️  Downloading: {filename}")
-    logging.info(f"Downloading: {filename} -> {destination_path}")
+    Collect sizes of files already present in a download directory
 
-    os.makedirs(destination_path, exist_ok=True)
+    Args:
+        destination_path: Directory to scan
 
+    Returns:
+        dict: Mapping of filename to size in bytes (empty if missing dir)
+    """
+    sizes = {}
     try:
-        earthaccess.download(url, destination_path)
-        
-        # Verify the downloaded file
-        target_file_path = os.path.join(destination_path, filename)
-        if os.path.exists(target_file_path) and os.path.getsize(target_file_path) > 0:
-            downloaded_files.append(
-                (filename, destination_path, suffix.split('.')[0], granule_metadata))
-            logging.info(f"Successfully downloaded: {filename} ({os.path.getsize(target_file_path)} bytes)")
-            print(f"   ✅ Success: {filename}")
-        else:
-            logging.error(f"Download verification failed: {filename}")
-            print(f"   ❌ Verification failed: {filename}")
-            
-    except Exception as e:
-        logging.error(f"Error downloading {filename}: {str(e)}")
-        print(f"   ❌ Error: {filename} - {str(e)}")
+        with os.scandir(destination_path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    sizes[entry.name] = entry.stat().st_size
+    except FileNotFoundError:
+        pass
+    return sizes
@@ -0,0 +1,66 @@
+"""
+Long-running geeup worker process
+
+Spawned by upload.py to amortize geeup's startup cost: the geeup CLI
+entry point (and with it the Google auth/TLS client stack) is imported
+once, then JSON job records are dispatched in-process instead of paying
+a fresh fork/exec plus import per invocation.
+
+Protocol: one JSON object per line on stdin, e.g.
+    {"args": ["getmeta", "--input", "/data/LST", "--metadata", "/m.csv"]}
+answered with one JSON object per line on stdout, e.g.
+    {"returncode": 0, "output": ["Processing 1 of 10", ...]}
+geeup's own stdout/stderr is captured per job and returned in the
+result, so it cannot corrupt the result stream or spam the parent's
+terminal. EOF or a blank line shuts the worker down.
+"""
+import contextlib
+import io
+import json
+import sys
+from importlib.metadata import entry_points
+
+
+def _load_geeup_main():
+    """Load the geeup console-script entry point once"""
+    eps = entry_points()
+    try:
+        matches = eps.select(group='console_scripts', name='geeup')
+    except AttributeError:
+        # Python < 3.10 dict-style interface
+        matches = [ep for ep in eps.get('console_scripts', []) if ep.name == 'geeup']
+    for ep in matches:
+        return ep.load()
+    raise ImportError("geeup console script not found")
+
+
+def main():
+    geeup_main = _load_geeup_main()
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            break
+
+        job = json.loads(line)
+        result = {'returncode': 0}
+        captured = io.StringIO()
+        try:
+            sys.argv = ['geeup'] + list(job['args'])
+            with contextlib.redirect_stdout(captured), \
+                    contextlib.redirect_stderr(captured):
+                geeup_main()
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                result['returncode'] = e.code
+            elif e.code:
+                result = {'returncode': 1, 'error': str(e.code)}
+        except Exception as e:
+            result = {'returncode': 1, 'error': str(e)}
+
+        result['output'] = captured.getvalue().splitlines()
+        print(json.dumps(result), flush=True)
+
+
+if __name__ == '__main__':
+    main()
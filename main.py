@@ -7,16 +7,16 @@ import logging
 
 # Import configuration
 from config import (
-    MGRS_TILE, START_DATE, END_DATE, DAY_NIGHT, FILE_TYPES,
+    MGRS_TILE, START_DATE, END_DATE, DAY_NIGHT, DOWNLOAD_WORKERS, FILE_TYPES,
     DOWNLOAD_BASE, METADATA_PATH, GEE_PROJECT, GEE_UPLOAD_BASE, GEE_EMAIL,
-    ACTION, LOG_FILE, LOG_LEVEL, LOG_FORMAT
+    UPLOAD_WORKERS, UPLOAD_MODE, ACTION, LOG_FILE, LOG_LEVEL, LOG_FORMAT
 )
 
 # Import modules
 from auth import authenticate_earthaccess, authenticate_gee
 from download import search_ecostress_data, download_data
-from upload import upload_to_gee
-from utils import create_download_paths, create_upload_paths, organize_files_by_type
+from upload import upload_all_folders
+from utils import create_paths, organize_files_by_type
 
 
 def setup_logging():
@@ -88,7 +88,8 @@ def download_workflow(download_paths):
     )
 
     # Download data
-    downloaded_files = download_data(results, FILE_TYPES, download_paths)
+    downloaded_files = download_data(results, FILE_TYPES, download_paths,
+                                     max_workers=DOWNLOAD_WORKERS)
 
     logging.info(f"Downloaded {len(downloaded_files)} files")
     print(f"Downloaded {len(downloaded_files)} files")
@@ -105,6 +106,9 @@ def upload_workflow(download_paths, upload_paths, downloaded_files_by_type):
         upload_paths: Dictionary of upload paths
         downloaded_files_by_type: Files organized by type
     """
+    # Collect one job per non-empty folder
+    folder_jobs = []
+    type_names = {}
     for file_type, folder_path in download_paths.items():
         if os.path.exists(folder_path) and os.listdir(folder_path):
             type_name = file_type.split('.')[0]
@@ -112,22 +116,21 @@ def upload_workflow(download_paths, upload_paths, downloaded_files_by_type):
 
             print(f"Processing folder: {folder_path} -> {destination_path}")
 
-            # Get files for this type
-            files_for_type = downloaded_files_by_type.get(type_name, None)
+            folder_jobs.append(
+                (folder_path, destination_path, downloaded_files_by_type.get(type_name, None)))
+            type_names[folder_path] = type_name
 
-            # Upload to GEE
-            success = upload_to_gee(
-                folder_path=folder_path,
-                destination_path=destination_path,
-                metadata_path=METADATA_PATH,
-                user_email=GEE_EMAIL,
-                downloaded_files=files_for_type
-            )
+    # Upload all folders concurrently
+    results = upload_all_folders(
+        folder_jobs, METADATA_PATH, GEE_EMAIL, max_workers=UPLOAD_WORKERS,
+        mode=UPLOAD_MODE)
 
-            if success:
-                print(f"Successfully uploaded {type_name} data to {destination_path}")
-            else:
-                print(f"Failed to upload {type_name} data")
+    for folder_path, destination_path, _ in folder_jobs:
+        type_name = type_names[folder_path]
+        if results.get(folder_path):
+            print(f"Successfully uploaded {type_name} data to {destination_path}")
+        else:
+            print(f"Failed to upload {type_name} data")
 
 
 def main():
@@ -139,8 +142,7 @@ def main():
     print("=" * 60)
     
     # Create paths
-    download_paths = create_download_paths(DOWNLOAD_BASE, FILE_TYPES)
-    upload_paths = create_upload_paths(GEE_UPLOAD_BASE, FILE_TYPES)
+    download_paths, upload_paths = create_paths(DOWNLOAD_BASE, GEE_UPLOAD_BASE, FILE_TYPES)
 
     # Authenticate based on action
     earthaccess_auth, gee_auth = authenticate_services(ACTION)
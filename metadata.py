@@ -1,8 +1,36 @@
 """
 Metadata extraction and processing utilities
 """
+import calendar
 import re
 from datetime import datetime
+from functools import lru_cache
+
+# Filename patterns for ECOSTRESS granule IDs, compiled once at import so
+# extract_granule_metadata doesn't recompile them for every granule
+PROCESSING_ID_PATTERN = re.compile(r'T\d{6}_(\d{4}_\d{2})$')
+MGRS_TILE_PATTERN = re.compile(r'_(\d{2}[A-Z]{3})_')
+ORBIT_PATTERN = re.compile(r'_LSTE_(\d+)_')
+VERSION_PATTERN = re.compile(r'ECOv(\d+)_')
+LEVEL_PATTERN = re.compile(r'ECOv\d+_(L\d[A-Z]?)_')
+SCENE_PATTERN = re.compile(r'_LSTE_\d+_(\d{3})_')
+ORBIT_SCENE_PATTERN = re.compile(r'_LSTE_(\d+_\d{3})_')
+
+# Fused pattern for well-formed granule URs such as
+# ECOv002_L2T_LSTE_00048_003_18TUN_20250101T120000_0712_01, extracting
+# every field in a single scan instead of one pass per pattern above
+GRANULE_UR_PATTERN = re.compile(
+    r'ECOv(?P<version>\d+)_(?P<level>L\d[A-Z]?)_LSTE_'
+    r'(?P<orbit>\d+)_(?P<scene>\d{3})_(?P<mgrs>\d{2}[A-Z]{3})_'
+    r'\d{8}T\d{6}_(?P<processing_id>\d{4}_\d{2})$'
+)
+
+# MGRS latitude bands N-X lie in the northern hemisphere
+_NORTHERN_BANDS = frozenset('NPQRSTUVWX')
+
+# Lowercases attribute names and maps '-' to '_' in one C-level pass
+_ATTR_NAME_TRANSLATION = str.maketrans(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZ-', 'abcdefghijklmnopqrstuvwxyz_')
 
 
 def extract_granule_metadata(granule):
@@ -77,8 +105,9 @@ def extract_granule_metadata(granule):
     # Add platform and instrument information
     metadata.update(_extract_platform_metadata(umm))
 
-    # Add size information
-    metadata['size_mb'] = granule.size()
+    # Add size information (read straight from the UMM record instead
+    # of granule.size(), which redoes the same dict walks internally)
+    metadata['size_mb'] = _extract_size_mb(data_granule)
 
     # Add orbit information
     metadata.update(_extract_orbit_metadata(umm))
@@ -94,51 +123,97 @@ def extract_granule_metadata(granule):
 
 def _extract_filename_metadata(granule_ur):
     """Extract metadata from filename"""
+    # Fast path: one fused match covers every field for standard URs
+    fused_match = GRANULE_UR_PATTERN.search(granule_ur)
+    if fused_match:
+        parts = fused_match.groupdict()
+        return {
+            'processing_ID': parts['processing_id'],
+            'mgrs_tile': parts['mgrs'],
+            'orbit_number_from_filename': parts['orbit'],
+            'version_from_filename': parts['version'],
+            'processing_level': parts['level'],
+            'scene': int(parts['scene']),
+            'orbit_scene': f"{parts['orbit']}_{parts['scene']}",
+        }
+
+    # Fall back to the per-field patterns for non-standard URs
     metadata = {}
-    
+
     # Extract processing ID suffix (0712_01)
-    suffix_match = re.search(r'T\d{6}_(\d{4}_\d{2})$', granule_ur)
+    suffix_match = PROCESSING_ID_PATTERN.search(granule_ur)
     if suffix_match:
         metadata['processing_ID'] = suffix_match.group(1)
 
     # Extract MGRS tile (e.g., 19FGE)
-    mgrs_match = re.search(r'_(\d{2}[A-Z]{3})_', granule_ur)
+    mgrs_match = MGRS_TILE_PATTERN.search(granule_ur)
     if mgrs_match:
         metadata['mgrs_tile'] = mgrs_match.group(1)
 
     # Extract orbit number (e.g., 00048)
-    orbit_match = re.search(r'_LSTE_(\d+)_', granule_ur)
+    orbit_match = ORBIT_PATTERN.search(granule_ur)
     if orbit_match:
         metadata['orbit_number_from_filename'] = orbit_match.group(1)
 
     # Extract version (e.g., 002)
-    version_match = re.search(r'ECOv(\d+)_', granule_ur)
+    version_match = VERSION_PATTERN.search(granule_ur)
     if version_match:
         metadata['version_from_filename'] = version_match.group(1)
 
     # Extract processing level (e.g., L2T)
-    level_match = re.search(r'ECOv\d+_(L\d[A-Z]?)_', granule_ur)
+    level_match = LEVEL_PATTERN.search(granule_ur)
     if level_match:
         metadata['processing_level'] = level_match.group(1)
 
     # Extract scene number (e.g., 003 → 3)
-    scene_match = re.search(r'_LSTE_\d+_(\d{3})_', granule_ur)
+    scene_match = SCENE_PATTERN.search(granule_ur)
     if scene_match:
         metadata['scene'] = int(scene_match.group(1))
 
     # Extract orbit_scene (e.g., 00048_003)
-    orbit_scene_match = re.search(r'_LSTE_(\d+_\d{3})_', granule_ur)
+    orbit_scene_match = ORBIT_SCENE_PATTERN.search(granule_ur)
     if orbit_scene_match:
         metadata['orbit_scene'] = orbit_scene_match.group(1)
     
     return metadata
 
 
+def iso_to_timestamp_ms(datetime_str):
+    """
+    Convert an ISO-8601 datetime string to epoch milliseconds
+
+    Granule timestamps are fixed-layout YYYY-MM-DDTHH:MM:SS[.fff]Z UTC
+    strings, so the fields are sliced out directly and fed through
+    calendar.timegm instead of the much heavier datetime.fromisoformat
+    plus timezone conversion. Anything not matching that layout falls
+    back to fromisoformat.
+
+    Args:
+        datetime_str: ISO datetime string (e.g. "2025-01-01T12:00:00.000Z")
+
+    Returns:
+        int: Timestamp in milliseconds since the epoch
+    """
+    if datetime_str.endswith('Z'):
+        try:
+            seconds = calendar.timegm((
+                int(datetime_str[0:4]), int(datetime_str[5:7]), int(datetime_str[8:10]),
+                int(datetime_str[11:13]), int(datetime_str[14:16]), int(datetime_str[17:19])))
+            fraction = 0.0
+            if datetime_str[19] == '.':
+                fraction = float('0' + datetime_str[19:-1])
+            return int((seconds + fraction) * 1000)
+        except (ValueError, IndexError):
+            pass
+
+    dt = datetime.fromisoformat(datetime_str.replace('Z', '+00:00'))
+    return int(dt.timestamp() * 1000)
+
+
 def _convert_to_timestamp(datetime_str):
     """Convert ISO datetime string to timestamp in milliseconds"""
     try:
-        dt = datetime.fromisoformat(datetime_str.replace('Z', '+00:00'))
-        return int(dt.timestamp() * 1000)
+        return iso_to_timestamp_ms(datetime_str)
     except Exception as e:
         print(f"Error converting beginning_date_time to timestamp: {str(e)}")
         return ""
@@ -146,8 +221,12 @@ def _convert_to_timestamp(datetime_str):
 
 def _extract_spatial_metadata(umm):
     """Extract spatial extent metadata"""
-    spatial_extent = umm.get("SpatialExtent", {}).get("HorizontalSpatialDomain", {}).get("Geometry", {})
-    bounding_rect = spatial_extent.get("BoundingRectangles", [{}])[0] if "BoundingRectangles" in spatial_extent else {}
+    # Direct indexing walks the common path without allocating the
+    # throwaway default dicts a chain of .get({}) calls would
+    try:
+        bounding_rect = umm["SpatialExtent"]["HorizontalSpatialDomain"]["Geometry"]["BoundingRectangles"][0]
+    except (KeyError, IndexError, TypeError):
+        bounding_rect = {}
 
     return {
         'north_lat': bounding_rect.get("NorthBoundingCoordinate", ""),
@@ -168,17 +247,29 @@ def _extract_provider_dates(umm):
     return metadata
 
 
+def _extract_size_mb(data_granule):
+    """Sum the granule's archive file sizes in megabytes"""
+    return sum(
+        info.get("Size", 0)
+        for info in data_granule.get("ArchiveAndDistributionInformation", [])
+        if info.get("SizeUnit", "MB") == "MB"
+    )
+
+
 def _extract_platform_metadata(umm):
     """Extract platform and instrument information"""
     metadata = {'platform_short_name': '', 'sensor': ''}
-    
-    platforms = umm.get("Platforms", [])
-    if platforms:
-        metadata['platform_short_name'] = platforms[0].get("ShortName", "ISS")
-        instruments = platforms[0].get("Instruments", [])
-        if instruments:
-            metadata['sensor'] = instruments[0].get("ShortName", "ECOSTRESS")
-    
+
+    try:
+        platform = umm["Platforms"][0]
+    except (KeyError, IndexError, TypeError):
+        return metadata
+
+    metadata['platform_short_name'] = platform.get("ShortName", "ISS")
+    instruments = platform.get("Instruments")
+    if instruments:
+        metadata['sensor'] = instruments[0].get("ShortName", "ECOSTRESS")
+
     return metadata
 
 
@@ -191,20 +282,23 @@ def _extract_orbit_metadata(umm):
     }
 
     # Check OrbitCalculatedSpatialDomains
-    if "OrbitCalculatedSpatialDomains" in umm:
-        orbits = umm.get("OrbitCalculatedSpatialDomains", [])
-        if orbits and isinstance(orbits, list) and len(orbits) > 0:
-            if "BeginOrbitNumber" in orbits[0]:
-                metadata['begin_orbit_number'] = orbits[0].get("BeginOrbitNumber", "")
-                metadata['end_orbit_number'] = orbits[0].get("EndOrbitNumber", "")
-                metadata['orbit_number'] = orbits[0].get("BeginOrbitNumber", "")
+    try:
+        orbit = umm["OrbitCalculatedSpatialDomains"][0]
+    except (KeyError, IndexError, TypeError):
+        orbit = {}
+    if "BeginOrbitNumber" in orbit:
+        metadata['begin_orbit_number'] = orbit.get("BeginOrbitNumber", "")
+        metadata['end_orbit_number'] = orbit.get("EndOrbitNumber", "")
+        metadata['orbit_number'] = orbit.get("BeginOrbitNumber", "")
 
     # Check OrbitParameters
-    if "OrbitParameters" in umm and not metadata['orbit_number']:
-        orbits = umm.get("OrbitParameters", [])
-        if orbits and isinstance(orbits, list) and len(orbits) > 0:
-            if "OrbitNumber" in orbits[0]:
-                metadata['orbit_number'] = orbits[0].get("OrbitNumber", "")
+    if not metadata['orbit_number']:
+        try:
+            orbit_params = umm["OrbitParameters"][0]
+        except (KeyError, IndexError, TypeError):
+            orbit_params = {}
+        if "OrbitNumber" in orbit_params:
+            metadata['orbit_number'] = orbit_params.get("OrbitNumber", "")
 
     return metadata
 
@@ -220,20 +314,21 @@ def _extract_parameter_names(umm):
 
 def _extract_additional_attributes(umm):
     """Extract additional attributes"""
-    metadata = {}
-    add_attrs = umm.get("AdditionalAttributes", [])
-    for attr in add_attrs:
-        attr_name = attr.get("Name", "")
-        if attr_name and "Values" in attr and attr["Values"]:
-            safe_name = attr_name.lower().replace("-", "_")
-            metadata[f'attr_{safe_name}'] = ", ".join(attr["Values"])
-    return metadata
+    return {
+        f"attr_{attr['Name'].translate(_ATTR_NAME_TRANSLATION)}": ", ".join(attr["Values"])
+        for attr in umm.get("AdditionalAttributes", ())
+        if attr.get("Name") and attr.get("Values")
+    }
 
 
+@lru_cache(maxsize=1024)
 def get_epsg_from_mgrs(mgrs_tile):
     """
     Extract EPSG code from MGRS tile string
-    
+
+    Cached: any run only sees a handful of distinct tiles, so repeated
+    calls from the per-row CSV enhancement become dict lookups.
+
     Args:
         mgrs_tile: MGRS tile string (e.g., "18TUN")
         
@@ -243,7 +338,6 @@ def get_epsg_from_mgrs(mgrs_tile):
     if not mgrs_tile or len(mgrs_tile) < 3:
         return ""
 
-    utm_zone = mgrs_tile[:2]
-    hemisphere = 'north' if mgrs_tile[2] in 'NPQRSTUVWX' else 'south'
-    epsg_code = f"EPSG326{utm_zone}" if hemisphere == 'north' else f"EPSG327{utm_zone}"
-    return epsg_code
+    if mgrs_tile[2] in _NORTHERN_BANDS:
+        return "EPSG326" + mgrs_tile[:2]
+    return "EPSG327" + mgrs_tile[:2]
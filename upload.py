@@ -2,70 +2,569 @@
 Google Earth Engine upload utilities
 """
 import os
+import atexit
+import hashlib
+import json
 import logging
+import random
+import re
+import shutil
+import sqlite3
 import subprocess
+import sys
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from csv_handler import enhance_metadata_csv
 
+# Resolved lazily (and only once) by _find_geeup
+_geeup_path = None
 
-def upload_to_gee(folder_path, destination_path, metadata_path, user_email, downloaded_files=None):
+# Cheap sanity checks so a typoed email or asset path fails immediately
+# instead of after a doomed geeup launch
+_EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+_DEST_PATTERN = re.compile(r'^(projects|users)/[^/\s]+/\S+$')
+
+# Failures whose geeup output matches this are permanent (bad
+# credentials or missing rights); retrying them cannot help
+_PERMANENT_ERROR_PATTERN = re.compile(
+    r'auth|permission|credential|forbidden|unauthorized|401|403', re.IGNORECASE)
+
+# Persistent geeup worker processes, one per uploading thread
+_worker_local = threading.local()
+_workers = []
+_workers_lock = threading.Lock()
+
+# Extended attribute recording which folder state a metadata CSV was
+# generated from, so unchanged folders skip geeup getmeta entirely
+_METAHASH_XATTR = 'user.ecostress.metahash'
+
+# Metadata CSVs already generated in this process, keyed on
+# (folder_path, metadata_path, folder fingerprint), so sibling uploads
+# of the same folder reuse one geeup getmeta run
+_metadata_csv_cache = set()
+_metadata_csv_lock = threading.Lock()
+
+# Manifest of completed uploads keyed on (destination, folder fingerprint),
+# so unchanged folders skip the whole geeup pipeline across runs
+_MANIFEST_PATH = os.path.expanduser('~/.cache/ecostress/upload_state.sqlite')
+
+
+def upload_all_folders(folder_jobs, metadata_path, user_email, max_workers=8,
+                       batch_size=200, force=False, mode="full"):
+    """
+    Upload multiple folders to GEE concurrently
+
+    Each folder is an independent GEE destination and the geeup
+    subprocesses block on the network, so running them through a bounded
+    thread pool overlaps the per-folder upload latency. Folders that
+    share a destination collection are first bundled into staged batches
+    so each geeup invocation covers as many files as possible.
+
+    Args:
+        folder_jobs: List of (folder_path, destination_path,
+            downloaded_files) tuples; downloaded_files may be None
+        metadata_path: Path to the metadata CSV file
+        user_email: GEE user email
+        max_workers: Number of concurrent folder uploads
+        batch_size: Maximum number of files per bundled geeup invocation
+        force: Re-upload folders even if the manifest marks them done
+        mode: Pipeline phase selection, see upload_to_gee
+
+    Returns:
+        dict: Mapping of source folder_path to upload success
+    """
+    results = {}
+    staging_dirs = []
+    try:
+        folder_jobs, source_folders = _bundle_folder_jobs(
+            folder_jobs, batch_size, staging_dirs)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    upload_to_gee, folder_path, destination_path, metadata_path,
+                    user_email, downloaded_files, force, mode): folder_path
+                for folder_path, destination_path, downloaded_files in folder_jobs
+            }
+            for future in as_completed(futures):
+                folder_path = futures[future]
+                try:
+                    success = future.result()
+                except Exception as e:
+                    logging.error("Upload failed for %s: %s", folder_path, str(e))
+                    success = False
+                # Attribute the batch outcome back to the source folders
+                # whose files it carried; a folder spread across several
+                # batches succeeds only if every one of them did
+                for source in source_folders[folder_path]:
+                    results[source] = results.get(source, True) and success
+    finally:
+        for staging_dir in staging_dirs:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    return results
+
+
+def _bundle_folder_jobs(folder_jobs, batch_size, staging_dirs):
+    """
+    Merge folders sharing a GEE destination into staged symlink batches
+
+    A geeup invocation pays process startup, auth refresh and TLS setup
+    once regardless of file count, so folders targeting the same
+    destination are combined into a single staging directory of
+    symlinks (no copy cost) and uploaded together. Batches are split
+    when they would exceed batch_size files. Folders with a unique
+    destination pass through untouched.
+
+    Staging directories are appended to the caller-owned staging_dirs
+    list as they are created, so the caller can clean them up even if
+    bundling fails partway through.
+
+    Returns:
+        tuple: (bundled job list, mapping of each bundled job path to
+            the source folder paths whose files it carries)
+    """
+    jobs_by_dest = {}
+    for folder_path, destination_path, downloaded_files in folder_jobs:
+        jobs_by_dest.setdefault(destination_path, []).append(
+            (folder_path, downloaded_files))
+
+    bundled = []
+    source_folders = {}
+    for destination_path, jobs in jobs_by_dest.items():
+        if len(jobs) == 1:
+            folder_path, downloaded_files = jobs[0]
+            bundled.append((folder_path, destination_path, downloaded_files))
+            source_folders[folder_path] = [folder_path]
+            continue
+
+        # Duplicate basenames would collide both as symlinks here and as
+        # asset IDs at the destination, so keep the first and warn
+        source_files = []
+        seen_names = set()
+        for folder_path, _ in jobs:
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    if entry.name in seen_names:
+                        logging.warning(
+                            "Skipping %s: duplicate filename in bundle for %s",
+                            entry.path, destination_path)
+                        continue
+                    seen_names.add(entry.name)
+                    source_files.append(entry.path)
+
+        combined_files = [t for _, files in jobs if files for t in files] or None
+        group_folders = [folder_path for folder_path, _ in jobs]
+
+        for start in range(0, len(source_files), batch_size):
+            staging_dir = tempfile.mkdtemp(prefix='ecostress_upload_')
+            staging_dirs.append(staging_dir)
+            for source in source_files[start:start + batch_size]:
+                os.symlink(source, os.path.join(staging_dir, os.path.basename(source)))
+            bundled.append((staging_dir, destination_path, combined_files))
+            source_folders[staging_dir] = group_folders
+            logging.info(
+                "Bundled %s files from %s folders into %s for %s",
+                min(batch_size, len(source_files) - start), len(jobs),
+                staging_dir, destination_path)
+
+    return bundled, source_folders
+
+
+def upload_to_gee(folder_path, destination_path, metadata_path, user_email,
+                  downloaded_files=None, force=False, mode="full"):
     """
     Upload data to Google Earth Engine using geeup
-    
+
     Args:
         folder_path: Local folder containing files to upload
         destination_path: GEE destination path
         metadata_path: Path to metadata CSV file
         user_email: GEE user email
         downloaded_files: Optional list of downloaded file information
-        
+        force: Re-upload even if the manifest shows this folder state
+            was already uploaded to this destination
+        mode: "full" runs both phases; "meta" stops after metadata
+            generation/enhancement (no network upload); "upload" assumes
+            the metadata CSV already exists and only uploads
+
     Returns:
         bool: True if successful, False otherwise
     """
-    logging.info(f"Uploading data from {folder_path} to {destination_path}")
+    if mode not in ("full", "meta", "upload"):
+        raise ValueError(f"Unknown upload mode: {mode}")
+    _validate_email(user_email)
+    _validate_dest(destination_path)
 
-    # Generate folder-specific metadata path
+    # Skip empty folder shells before paying any geeup process cost;
+    # scandir stops at the first real file
+    try:
+        with os.scandir(folder_path) as entries:
+            has_files = any(entry.is_file() for entry in entries)
+    except FileNotFoundError:
+        has_files = False
+    if not has_files:
+        logging.info("Skipping %s: no files to upload", folder_path)
+        return True
+
+    # Skip folders whose exact state already reached this destination in
+    # an earlier run; geeup itself has no client-side idea of remote state
+    fingerprint = _folder_fingerprint(folder_path)
+    if mode != "meta" and not force and _already_uploaded(destination_path, fingerprint):
+        logging.info(
+            "Skipping %s: already uploaded to %s", folder_path, destination_path)
+        return True
+
+    logging.info("Uploading data from %s to %s", folder_path, destination_path)
+
+    # Generate folder-specific metadata path; splitext only touches the
+    # real extension, unlike str.replace which would also rewrite any
+    # '.csv' occurring earlier in the path
     folder_name = os.path.basename(folder_path)
-    folder_metadata_path = metadata_path.replace('.csv', f'_{folder_name}.csv')
+    root, ext = os.path.splitext(metadata_path)
+    folder_metadata_path = f"{root}_{folder_name}{ext}"
 
-    # Generate metadata CSV for this specific folder
-    if not _generate_metadata_csv(folder_path, folder_metadata_path):
-        return False
+    if mode != "upload":
+        # Generate metadata CSV for this specific folder
+        if not _generate_metadata_csv(folder_path, folder_metadata_path):
+            return False
+
+        # Enhance metadata with additional properties
+        enhance_metadata_csv(
+            folder_metadata_path,
+            {folder_name: folder_path},
+            downloaded_files
+        )
 
-    # Enhance metadata with additional properties
-    enhance_metadata_csv(
-        folder_metadata_path,
-        {folder_name: folder_path},
-        downloaded_files
-    )
+        # The enhancement may rewrite the CSV through a temp file, which
+        # drops xattrs, so re-record the folder fingerprint on the result
+        _store_metahash(folder_metadata_path, fingerprint)
+
+    if mode == "meta":
+        logging.info("Metadata-only mode: not uploading %s", folder_path)
+        return True
 
     # Upload to GEE
-    return _upload_with_geeup(folder_path, destination_path, folder_metadata_path, user_email)
+    if not _upload_with_geeup(folder_path, destination_path, folder_metadata_path, user_email):
+        return False
 
+    _record_upload(destination_path, fingerprint)
+    return True
 
-def _generate_metadata_csv(folder_path, metadata_path):
-    """Generate metadata CSV using geeup"""
-    generate_csv_command = f'geeup getmeta --input {folder_path} --metadata {metadata_path}'
-    logging.info(f"Running command: {generate_csv_command}")
 
-    try:
-        subprocess.run(generate_csv_command, shell=True, check=True)
-        logging.info(f"Metadata CSV generated successfully")
-        return True
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error generating metadata CSV: {str(e)}")
+def _validate_email(user_email):
+    """Raise ValueError if user_email is not a plausible email address"""
+    if not user_email or not _EMAIL_PATTERN.match(user_email):
+        raise ValueError(f"Invalid GEE user email: {user_email!r}")
+
+
+def _validate_dest(destination_path):
+    """Raise ValueError if destination_path is not a GEE asset path"""
+    if not destination_path or not _DEST_PATTERN.match(destination_path):
+        raise ValueError(
+            f"Invalid GEE destination path: {destination_path!r} "
+            "(expected projects/<project>/... or users/<user>/...)")
+
+
+class _GeeupWorker:
+    """
+    A long-running worker process that executes geeup jobs over stdin
+
+    geeup re-imports the Google auth/TLS stack on every CLI start, so a
+    fork/exec per folder pays that warmup each time. The worker process
+    (geeup_worker.py) loads the geeup entry point once and then accepts
+    JSON job lines, keeping only the actual network work per job.
+    """
+
+    def __init__(self):
+        worker_script = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), 'geeup_worker.py')
+        self._process = subprocess.Popen(
+            [sys.executable, worker_script], text=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        with _workers_lock:
+            _workers.append(self)
+
+    def submit(self, args):
+        """Run one geeup job in the worker; returns the result record"""
+        self._process.stdin.write(json.dumps({'args': args}) + '\n')
+        self._process.stdin.flush()
+        line = self._process.stdout.readline()
+        if not line:
+            raise RuntimeError("geeup worker exited unexpectedly")
+        result = json.loads(line)
+        # Mirror the subprocess path's drain thread: geeup's captured
+        # per-file progress goes to debug logging, not the terminal
+        for output_line in result.get('output', []):
+            logging.debug("geeup: %s", output_line)
+        return result
+
+    def close(self):
+        """Shut the worker down, escalating to kill if it hangs"""
+        try:
+            if self._process.poll() is None:
+                self._process.stdin.close()
+                self._process.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+
+
+def _shutdown_workers():
+    with _workers_lock:
+        for worker in _workers:
+            worker.close()
+        _workers.clear()
+
+
+atexit.register(_shutdown_workers)
+
+
+def _run_geeup(args, description):
+    """
+    Run a geeup job, preferring the per-thread persistent worker
+
+    Falls back to a one-shot subprocess when the worker cannot start or
+    dies (e.g. geeup is installed as a script but not importable). The
+    failed job's output is kept in _worker_local.last_output so callers
+    can classify the failure.
+    """
+    _worker_local.last_output = []
+    worker = getattr(_worker_local, 'worker', None)
+    if worker is None and not getattr(_worker_local, 'worker_failed', False):
+        try:
+            worker = _GeeupWorker()
+            _worker_local.worker = worker
+        except OSError:
+            _worker_local.worker_failed = True
+
+    if worker is not None:
+        try:
+            result = worker.submit(args)
+            if result.get('returncode', 1) == 0:
+                logging.info("%s completed successfully", description)
+                return True
+            # Keep the captured geeup output (and any exception text) so
+            # _upload_with_geeup can tell permanent failures from
+            # transient ones, as the drain thread does for the fallback
+            _worker_local.last_output = list(result.get('output', []))
+            if result.get('error'):
+                _worker_local.last_output.append(result['error'])
+            logging.error(
+                "%s failed in geeup worker: %s", description,
+                result.get('error', f"exit {result.get('returncode')}"))
+            return False
+        except (OSError, RuntimeError, ValueError) as e:
+            logging.warning(
+                "geeup worker unavailable (%s), falling back to subprocess", str(e))
+            worker.close()
+            _worker_local.worker = None
+            _worker_local.worker_failed = True
+
+    process = _start_geeup(args)
+    success = _finish_geeup(process, description)
+    if not success:
+        _worker_local.last_output = process.output_lines
+    return success
+
+
+def _find_geeup():
+    """Resolve the geeup executable once and cache the path"""
+    global _geeup_path
+    if _geeup_path is None:
+        _geeup_path = shutil.which("geeup")
+        if _geeup_path is None:
+            raise FileNotFoundError(
+                "geeup executable not found on PATH; install it with 'pip install geeup'")
+    return _geeup_path
+
+
+def _start_geeup(args):
+    """
+    Start a geeup subprocess without blocking on it
+
+    Returns the Popen handle with stdout/stderr captured, so callers can
+    submit work and collect completion separately.
+
+    Args:
+        args: geeup arguments as a list (e.g. ['getmeta', '--input', ...])
+    """
+    command = [_find_geeup()] + args
+    logging.info("Running command: %s", ' '.join(command))
+    process = subprocess.Popen(
+        command, text=True, bufsize=1,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+    # Drain output continuously in the background so the child never
+    # stalls on a full pipe (or a slow shared terminal) while printing
+    # its per-file progress lines
+    process.output_lines = []
+    process.drain_thread = threading.Thread(
+        target=_drain_output, args=(process.stdout, process.output_lines),
+        daemon=True)
+    process.drain_thread.start()
+    return process
+
+
+def _drain_output(stream, collected):
+    """Forward subprocess output line by line to debug logging"""
+    with stream:
+        for line in stream:
+            line = line.rstrip()
+            collected.append(line)
+            logging.debug("geeup: %s", line)
+
+
+def _finish_geeup(process, description):
+    """Wait for a geeup subprocess and check its exit status"""
+    process.wait()
+    process.drain_thread.join()
+    if process.returncode != 0:
+        tail = '\n'.join(process.output_lines[-20:])
+        logging.error("%s failed (exit %s): %s", description, process.returncode, tail)
         return False
+    logging.info("%s completed successfully", description)
+    return True
 
 
-def _upload_with_geeup(folder_path, destination_path, metadata_path, user_email):
-    """Upload to GEE using geeup"""
-    upload_command = f'geeup upload --source {folder_path} --dest {destination_path} -m {metadata_path} -u {user_email}'
-    logging.info(f"Running command: {upload_command}")
-    print(f"Uploading to GEE: {folder_path} -> {destination_path}")
+def _folder_fingerprint(folder_path):
+    """Hash the folder's (name, mtime, size) triples in one scandir pass"""
+    digest = hashlib.md5()
+    try:
+        with os.scandir(folder_path) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_file():
+                    info = entry.stat()
+                    digest.update(
+                        f"{entry.name}:{info.st_mtime_ns}:{info.st_size};".encode())
+    except FileNotFoundError:
+        return ""
+    return digest.hexdigest()
+
 
+def _cached_metahash(metadata_path):
+    """Read the folder fingerprint stored on a metadata CSV, if any"""
+    if not hasattr(os, 'getxattr'):
+        return None
     try:
-        subprocess.run(upload_command, shell=True, check=True)
-        logging.info(f"Upload to {destination_path} completed successfully")
-        return True
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error during geeup upload: {str(e)}")
+        return os.getxattr(metadata_path, _METAHASH_XATTR).decode()
+    except OSError:
+        # Missing file, missing attribute, or no xattr support
+        return None
+
+
+def _store_metahash(metadata_path, fingerprint):
+    """Record the folder fingerprint on a metadata CSV (best effort)"""
+    if not fingerprint or not hasattr(os, 'setxattr'):
+        return
+    try:
+        os.setxattr(metadata_path, _METAHASH_XATTR, fingerprint.encode())
+    except OSError:
+        pass  # filesystem without xattr support
+
+
+def _manifest_connection():
+    """Open the upload manifest database, creating it on first use"""
+    os.makedirs(os.path.dirname(_MANIFEST_PATH), exist_ok=True)
+    connection = sqlite3.connect(_MANIFEST_PATH)
+    # WAL lets the parallel upload workers read and write without
+    # blocking each other
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS uploads ("
+        "dest TEXT, fp TEXT, uploaded_at INTEGER, PRIMARY KEY (dest, fp))")
+    return connection
+
+
+def _already_uploaded(destination_path, fingerprint):
+    """Check the manifest for a completed upload of this folder state"""
+    if not fingerprint:
         return False
+    try:
+        with _manifest_connection() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM uploads WHERE dest = ? AND fp = ?",
+                (destination_path, fingerprint)).fetchone()
+        return row is not None
+    except (sqlite3.Error, OSError):
+        return False
+
+
+def _record_upload(destination_path, fingerprint):
+    """Record a completed upload in the manifest (best effort)"""
+    if not fingerprint:
+        return
+    try:
+        with _manifest_connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO uploads (dest, fp, uploaded_at) "
+                "VALUES (?, ?, ?)",
+                (destination_path, fingerprint, int(time.time())))
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def _generate_metadata_csv(folder_path, metadata_path):
+    """Generate metadata CSV using geeup, skipping unchanged folders"""
+    fingerprint = _folder_fingerprint(folder_path)
+    cache_key = (folder_path, metadata_path, fingerprint)
+    if fingerprint:
+        # In-process memo: the same folder uploaded to several
+        # destinations only pays for geeup getmeta once
+        with _metadata_csv_lock:
+            if cache_key in _metadata_csv_cache:
+                return True
+        if _cached_metahash(metadata_path) == fingerprint:
+            logging.info("Metadata CSV up to date for %s, skipping regeneration", folder_path)
+            with _metadata_csv_lock:
+                _metadata_csv_cache.add(cache_key)
+            return True
+
+    if not _run_geeup(
+            ['getmeta', '--input', folder_path, '--metadata', metadata_path],
+            "Metadata CSV generation"):
+        return False
+
+    _store_metahash(metadata_path, fingerprint)
+    if fingerprint:
+        with _metadata_csv_lock:
+            _metadata_csv_cache.add(cache_key)
+    return True
+
+
+def _upload_with_geeup(folder_path, destination_path, metadata_path, user_email,
+                       max_retries=3):
+    """
+    Upload to GEE using geeup, retrying transient failures
+
+    Failures are retried with exponential backoff plus jitter unless the
+    captured geeup output points at an auth/permission problem, which no
+    amount of retrying will fix.
+    """
+    print(f"Uploading to GEE: {folder_path} -> {destination_path}")
+    args = ['upload', '--source', folder_path, '--dest', destination_path,
+            '-m', metadata_path, '-u', user_email]
+    description = f"Upload to {destination_path}"
+
+    for attempt in range(max_retries):
+        if _run_geeup(args, description):
+            return True
+
+        output = '\n'.join(getattr(_worker_local, 'last_output', []))
+        if _PERMANENT_ERROR_PATTERN.search(output):
+            logging.error(
+                "%s failed with an auth/permission error, not retrying",
+                description)
+            return False
+
+        if attempt + 1 < max_retries:
+            delay = min(60, 2 ** attempt) + random.random()
+            logging.warning(
+                "%s failed (attempt %d/%d), retrying in %.1fs",
+                description, attempt + 1, max_retries, delay)
+            time.sleep(delay)
+
+    return False
@@ -2,42 +2,77 @@
 Utility functions for path management and configuration
 """
 import os
+from itertools import groupby
+from operator import itemgetter
+from pathlib import PurePosixPath
+
+
+def create_paths(download_base, upload_base, file_types):
+    """
+    Create download and upload path dictionaries in one pass
+
+    The type name is derived once per file type and shared by both
+    dictionaries, instead of each helper re-splitting the suffixes.
+    Every download directory is created here, so callers can write into
+    the returned paths without their own exists-checks.
+
+    Args:
+        download_base: Base directory for downloads
+        upload_base: Base GEE path for uploads
+        file_types: List of file type suffixes
+
+    Returns:
+        tuple: (download_paths keyed by file type,
+            upload_paths keyed by type name)
+    """
+    parts = [(file_type, file_type.partition('.')[0]) for file_type in file_types]
+    download_paths = {
+        file_type: os.path.join(download_base, type_name)
+        for file_type, type_name in parts
+    }
+    # create_upload_paths passes an empty download base; don't create
+    # stray relative directories for it
+    if download_base:
+        for path in download_paths.values():
+            os.makedirs(path, exist_ok=True)
+    # GEE asset paths are POSIX-style; PurePosixPath normalizes a
+    # trailing slash on the base instead of emitting a double slash
+    gee_base = PurePosixPath(upload_base)
+    upload_paths = {
+        type_name: str(gee_base / f"ecostress_{type_name.lower()}")
+        for _, type_name in parts
+    }
+    return download_paths, upload_paths
 
 
 def create_download_paths(base_path, file_types):
     """
     Create download path dictionary from base path and file types
-    
+
+    The directories are created on disk as a side effect.
+
     Args:
         base_path: Base directory for downloads
         file_types: List of file type suffixes
-        
+
     Returns:
         dict: Mapping of file types to download paths
     """
-    download_paths = {}
-    for file_type in file_types:
-        type_name = file_type.split('.')[0]
-        download_paths[file_type] = os.path.join(base_path, type_name)
-    return download_paths
+    return create_paths(base_path, '', file_types)[0]
 
 
 def create_upload_paths(base_path, file_types):
     """
     Create upload path dictionary for GEE
-    
+
     Args:
         base_path: Base GEE path for uploads
         file_types: List of file type suffixes
-        
+
     Returns:
         dict: Mapping of type names to GEE upload paths
     """
-    upload_paths = {}
-    for file_type in file_types:
-        type_name = file_type.split('.')[0]
-        upload_paths[type_name] = f"{base_path}/ecostress_{type_name.lower()}"
-    return upload_paths
+    return create_paths('', base_path, file_types)[1]
 
 
 def organize_files_by_type(downloaded_files):
@@ -50,9 +85,12 @@ def organize_files_by_type(downloaded_files):
     Returns:
         dict: Files organized by type
     """
-    files_by_type = {}
-    for filename, folder_path, file_type, granule_metadata in downloaded_files:
-        if file_type not in files_by_type:
-            files_by_type[file_type] = []
-        files_by_type[file_type].append((filename, folder_path, file_type, granule_metadata))
-    return files_by_type
+    # sorted + groupby keyed by itemgetter runs the grouping in C,
+    # avoiding a per-tuple bytecode dict lookup and append; the sort
+    # is stable, so files keep their download order within each type
+    file_type = itemgetter(2)
+    return {
+        type_name: list(group)
+        for type_name, group in groupby(sorted(downloaded_files, key=file_type),
+                                        key=file_type)
+    }